@@ -7,25 +7,103 @@ spreadsheet to an output folder. Think of it as a mail-merge helper that reshape
 Shopify data into exactly what each supplier wants to see.
 """
 from __future__ import annotations
-import sys, argparse, re
+import sys, argparse, re, ast, copy, functools, warnings
 from pathlib import Path
 from datetime import datetime, timedelta
+import numpy as np
 import pandas as pd
 import yaml
 
+try:
+    import pyarrow as pa  # only needed for the fast CSV reader
+    import pyarrow.csv as pacsv
+    _HAS_PYARROW = True
+except ImportError:
+    _HAS_PYARROW = False
+try:
+    import python_calamine  # noqa: F401  (streaming .xlsx reader used by pandas' "calamine" engine)
+    _HAS_CALAMINE = True
+except ImportError:
+    _HAS_CALAMINE = False
+try:
+    import xlsxwriter  # noqa: F401  (faster .xlsx writer than openpyxl)
+    _HAS_XLSXWRITER = True
+except ImportError:
+    _HAS_XLSXWRITER = False
+try:
+    import polars as pl  # optional engine, see transform_polars
+except ImportError:
+    pl = None
+
+# LibYAML's C loader parses the same YAML several times faster; fall back when it's missing.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+_NON_WORD = re.compile(r"\W+")
+_WHITESPACE = re.compile(r"\s+")
+
+# The PyArrow CSV reader is told to treat every column as text and to use the same blank
+# markers as pandas, so it hands back exactly what `pd.read_csv(dtype=str)` would.
+_NA_VALUES = ["", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+              "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"]
+if _HAS_PYARROW:
+    try:
+        _TEXT_DTYPE = pd.StringDtype("pyarrow", na_value=np.nan)  # blanks are NaN, as with dtype=str
+    except TypeError:  # pandas < 2.3: its Arrow strings use pd.NA, so use plain text + NaN
+        _TEXT_DTYPE = None
+
+# Status columns only ever hold a handful of distinct values, so they are stored as
+# categories (one small integer per row) unless the config lists its own columns.
+_DEFAULT_CATEGORICAL_COLUMNS = ["financial_status", "fulfillment_status"]
+
 # ---- helpers ----
 # Everything below in this section are small utility functions that keep the
 # main workflow readable. Each one handles a very specific data-cleanup task.
-def to_date(s: str | pd.Timestamp) -> str:
+def to_date(s: str | pd.Timestamp | pd.Series) -> str | pd.Series:
     """Turn any date-like value into a neat 'YYYY-MM-DD' string or an empty string."""
+    if isinstance(s, pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(s.dtype):
+            ts = s  # already dates; no need to re-parse
+        else:
+            try:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore", FutureWarning)  # pandas < 3 warns instead
+                    ts = pd.to_datetime(s, errors="coerce", format="mixed")
+            except ValueError:
+                ts = None
+            if ts is None or not pd.api.types.is_datetime64_any_dtype(ts.dtype):
+                # mixed UTC offsets (e.g. -07:00 and -08:00 across a DST change) can't share
+                # one column without converting to UTC, which would shift the day; keep each
+                # value's own calendar date by formatting every distinct value on its own
+                return s.map({v: to_date(v) for v in s.dropna().unique()}).fillna("")
+        return ts.dt.strftime("%Y-%m-%d").fillna("")
     if pd.isna(s): return ""
     ts = pd.to_datetime(s, errors="coerce", utc=False)
     if pd.isna(ts): return ""
     return ts.strftime("%Y-%m-%d")
 
-def po_date_plus(date_str: str, days: int = 0) -> str:
+def po_date_plus(date_str: str | pd.Series, days: int = 0) -> str | pd.Series:
     """Add a number of days to a purchase-order date so we can express lead times."""
+    if isinstance(date_str, pd.Series):
+        if pd.api.types.is_datetime64_any_dtype(date_str.dtype):
+            date_str = to_date(date_str)
+        # blanks stay blank; YYYY-MM-DD values are shifted with NumPy day units, which is
+        # plain integer arithmetic. Anything else goes through strptime like a single value,
+        # so "2025-9-8" still works and "2025-09-28 20:47:54" still raises.
+        text = date_str.astype(object).where(date_str.notna(), "")
+        blank = (text == "").to_numpy(dtype=bool)
+        iso = text.str.fullmatch(r"\d{4}-\d{2}-\d{2}", na=False).to_numpy(dtype=bool)
+        d = text.where(iso, "").to_numpy().astype("datetime64[D]")
+        out = (d + np.timedelta64(days, "D")).astype(str).astype(object)
+        out[blank] = ""
+        if (other := ~(iso | blank)).any():
+            out[other] = [_shift_date(v, days) for v in text[other]]
+        return pd.Series(out, index=date_str.index)
     if not date_str: return ""
+    return _shift_date(date_str, days)
+
+@functools.lru_cache(maxsize=1024)
+def _shift_date(date_str: str, days: int) -> str:
+    # supplier files repeat the same few PO dates, so single-value calls are cached
     dt = datetime.strptime(date_str, "%Y-%m-%d") + timedelta(days=days)
     return dt.strftime("%Y-%m-%d")
 
@@ -33,83 +111,330 @@ def concat(*parts):
     """
     Join multiple bits of text into a single clean phrase.
     Example: concat('Blue', 'Size', 'M') -> 'Blue Size M'.
+    Passing whole columns (pandas Series) joins them row by row; see concat_series.
     """
+    if any(isinstance(p, pd.Series) for p in parts):
+        return concat_series(*parts)
     vals = []
     for p in parts:
         if isinstance(p, str): vals.append(p)
         else: vals.append("" if pd.isna(p) else str(p))
-    out = " ".join(x for x in vals if x and x != "nan")
-    return re.sub(r"\s+", " ", out).strip()
+    # split() + join collapses whitespace runs and trims the ends in one go
+    return " ".join(" ".join(x for x in vals if x and x != "nan").split())
+
+def concat_series(*parts) -> pd.Series:
+    """
+    Column-wide version of concat: each part is a Series or a single value, and the result
+    is one cleaned-up phrase per row.
+    """
+    index = next(p.index for p in parts if isinstance(p, pd.Series))
+    cols = []
+    for p in parts:
+        if isinstance(p, pd.Series):
+            col = p.astype(object).where(p.notna(), "").astype(str)
+        else:
+            col = pd.Series("" if not isinstance(p, str) and pd.isna(p) else str(p), index=index)
+        cols.append(col.where(col != "nan", ""))
+    # empty parts leave extra separators behind; the whitespace collapse cleans them up
+    out = cols[0].str.cat(cols[1:], sep=" ") if len(cols) > 1 else cols[0]
+    return out.str.replace(_WHITESPACE, " ", regex=True).str.strip()
 
 def normalize_column_name(name: str) -> str:
     """
     Make a column name predictable by lowercasing it and swapping symbols for underscores.
     This lets us compare columns even if the original export used spaces or punctuation.
     """
-    return re.sub(r"\W+", "_", name).strip("_").lower()
+    return _NON_WORD.sub("_", name).strip("_").lower()
+
+def load_frame(path: Path, columns: set[str] | None = None) -> pd.DataFrame:
+    """
+    Open either a CSV or Excel file and hand back a table (pandas DataFrame).
+    Every value is treated as text, which avoids surprises like ZIP codes losing their
+    leading zeros or prices losing their trailing ones. Excel files use the lighter
+    calamine reader for .xlsx when it is installed; CSV files use the much faster PyArrow
+    parser when it is installed.
+    When `columns` is given (normalized names), every other column is skipped while reading.
+    """
+    suffix = path.suffix.lower()
+    usecols = None if columns is None else (lambda c: normalize_column_name(c) in columns)
+    if suffix == ".xlsx" and _HAS_CALAMINE:
+        return pd.read_excel(path, sheet_name=0, dtype=str, engine="calamine", usecols=usecols)
+    if suffix in (".xlsx", ".xls"):
+        return pd.read_excel(path, sheet_name=0, dtype=str, usecols=usecols)
+    if not _HAS_PYARROW:
+        return pd.read_csv(path, dtype=str, usecols=usecols, memory_map=True)
+    try:
+        return _read_csv_arrow(path, usecols)
+    except (pa.ArrowInvalid, KeyError):
+        # rows PyArrow won't take (e.g. a row with fewer fields, which pandas pads with blanks)
+        return pd.read_csv(path, dtype=str, usecols=usecols, memory_map=True)
+
+def _read_csv_arrow(path: Path, usecols) -> pd.DataFrame:
+    """The PyArrow half of load_frame: same labels and blanks as `pd.read_csv(dtype=str)`."""
+    # pandas' engine="pyarrow" infers types first and only casts to str afterwards (too late
+    # for '02134' or '19.90'), so the column types are handed to PyArrow's reader directly.
+    # The labels come from pandas' own header parse ("Unnamed: 1", "sku.1", ...).
+    header = list(pd.read_csv(path, nrows=0).columns)
+    keep = header if usecols is None else [c for c in header if usecols(c)]
+    table = pacsv.read_csv(
+        path,
+        read_options=pacsv.ReadOptions(column_names=header, skip_rows=1),
+        parse_options=pacsv.ParseOptions(newlines_in_values=True),  # quoted multi-line notes
+        convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in keep},
+                                             include_columns=keep,
+                                             null_values=_NA_VALUES, strings_can_be_null=True))
+    if _TEXT_DTYPE is None:
+        df = table.to_pandas().astype(object)
+        return df.where(df.notna(), np.nan)
+    return table.to_pandas(types_mapper={pa.string(): _TEXT_DTYPE}.get)
+
+def status_matches(s: pd.Series, wanted: set[str]) -> np.ndarray:
+    """
+    Row-by-row True/False: is the status (case-insensitive, blanks count as "") one of `wanted`?
+    Statuses only take a handful of distinct values, so each distinct value is lowercased
+    and checked once, and rows are matched through their integer codes.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes, uniques = s.cat.codes.to_numpy(), s.cat.categories
+    else:
+        codes, uniques = pd.factorize(s)
+    hits = pd.Index(uniques, dtype=object).astype(str).str.lower().isin(wanted)
+    # missing values have code -1, which picks up the extra "blank" entry at the end
+    return np.append(hits, "" in wanted)[codes]
+
+def has_blank_text(s: pd.Series) -> bool:
+    """
+    Does any cell hold text made of nothing but whitespace? Missing cells don't count.
+    Number and date columns can't hold blank text, so they are not scanned at all.
+    """
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        # check each distinct value once, then look for rows that use a blank one
+        blank = np.flatnonzero(s.cat.categories.astype(str).str.strip() == "")
+        return blank.size > 0 and bool(np.isin(s.cat.codes.to_numpy(), blank).any())
+    if pd.api.types.is_object_dtype(s.dtype):
+        s = s.astype(str)
+    elif not pd.api.types.is_string_dtype(s.dtype):
+        return False
+    return bool((s.str.strip() == "").any())
+
+def write_frame(df: pd.DataFrame, path: Path, fmt: str) -> None:
+    """
+    Save the finished table as Excel or CSV. Excel files use the faster xlsxwriter engine
+    when it is installed. CSVs always go through pandas' writer: supplier systems often
+    import these files byte-for-byte, and PyArrow's writer quotes every text value.
+    """
+    if fmt == "xlsx":
+        df.to_excel(path, index=False, engine="xlsxwriter" if _HAS_XLSXWRITER else None)
+        return
+    df.to_csv(path, index=False)
+
+@functools.lru_cache(maxsize=None)
+def _parse_config(path: str, mtime_ns: int):
+    # mtime is part of the cache key so an edited config is picked up on the next call
+    return yaml.load(Path(path).read_text(), Loader=_YAML_LOADER)
+
+def load_config(path: Path) -> dict | None:
+    """
+    Read a supplier YAML file. Parsed configs are remembered until the file changes, which
+    keeps batch runs over many orders files from re-reading the same config each time.
+    """
+    path = Path(path)
+    return copy.deepcopy(_parse_config(str(path), path.stat().st_mtime_ns))
+
+# Formula pieces that mean the same thing for a whole column as for a single value.
+# Anything else (indexing like `sku[:3]`, attributes and method calls, `in`, conditionals,
+# `and`/`or`, ...) would silently act on the column itself, so it is evaluated row-by-row.
+_VECTOR_NODES = (ast.Expression, ast.Name, ast.Load, ast.Constant, ast.Call, ast.keyword,
+                 ast.BinOp, ast.UnaryOp, ast.Compare, ast.operator, ast.unaryop, ast.cmpop)
+_VECTOR_EXCLUDED = (ast.Mod, ast.Not, ast.In, ast.NotIn)  # `'%s' % col`, `not col`, `x in col`
+_VECTOR_HELPERS = {"concat", "to_date", "po_date_plus"}
+
+def _is_vectorizable(tree: ast.AST) -> bool:
+    """Can this formula be evaluated once with whole columns and give the row-by-row result?"""
+    for node in ast.walk(tree):
+        if not isinstance(node, _VECTOR_NODES) or isinstance(node, _VECTOR_EXCLUDED):
+            return False
+        if isinstance(node, ast.Compare) and len(node.ops) > 1:
+            return False  # `a < b < c` is really `a < b and b < c`
+        if isinstance(node, ast.Call):
+            if not (isinstance(node.func, ast.Name) and node.func.id in _VECTOR_HELPERS):
+                return False
+            if node.func.id == "po_date_plus":
+                extra = node.args[1:] + [k.value for k in node.keywords]
+                if not all(isinstance(a, ast.Constant) and type(a.value) is int for a in extra):
+                    return False  # the day offset must be one whole number for the whole column
+    return True
 
-def load_frame(path: Path) -> pd.DataFrame:
+def formula_names(tree: ast.AST) -> set[str]:
+    """Names a formula reads, leaving out variables it defines itself (lambda/comprehension)."""
+    bound = {n.arg for n in ast.walk(tree) if isinstance(n, ast.arg)}
+    bound |= {n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+    return {n.id for n in ast.walk(tree) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Load)} - bound
+
+def parse_formula(col: str, expr: str, allowed: set[str]) -> ast.Expression:
+    """
+    Parse a computed-column formula once and make sure it only refers to known columns and
+    helper functions, so typos are reported up front instead of failing on every row.
+    """
+    try:
+        tree = ast.parse(expr, mode="eval")
+    except SyntaxError as e:
+        raise ValueError(f"Computed column '{col}' has an invalid formula: {expr!r}") from e
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Attribute) and node.attr.startswith("_"):
+            raise ValueError(f"Computed column '{col}' may not use private attribute '{node.attr}'.")
+    if unknown := formula_names(tree) - allowed:
+        raise ValueError(f"Computed column '{col}' uses unknown name(s): {', '.join(sorted(unknown))}.")
+    return tree
+
+class _HoistConcat(ast.NodeTransformer):
     """
-    Open either a CSV or Excel file and hand back a table (pandas DataFrame) where all
-    values are treated as text. Treating everything as text avoids surprises like
-    ZIP codes losing their leading zeros.
+    Pull concat(...) calls whose arguments are only column names and literals out of a
+    formula, so they can run over whole columns even when the rest of the formula has to
+    be evaluated row-by-row. Each call is replaced by a placeholder name.
     """
-    if path.suffix.lower() in (".xlsx", ".xls"):
-        return pd.read_excel(path, dtype=str)
-    return pd.read_csv(path, dtype=str)
+    def __init__(self, columns):
+        self.columns = set(columns)
+        self.hoisted: dict[str, ast.expr] = {}
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+        if not (isinstance(node.func, ast.Name) and node.func.id == "concat") or node.keywords:
+            return node
+        if not all(isinstance(a, ast.Constant) or (isinstance(a, ast.Name) and (a.id in self.columns or a.id in self.hoisted))
+                   for a in node.args):
+            return node
+        name = f"__concat{len(self.hoisted)}"  # normalized column names never start with "_"
+        self.hoisted[name] = node
+        return ast.copy_location(ast.Name(id=name, ctx=ast.Load()), node)
 
 # mini “computed field” executor
 def apply_computed(df: pd.DataFrame, computed: dict[str, str]) -> pd.DataFrame:
     """
     Some suppliers need columns that are combinations of other fields (e.g., a label that
     stitches the style code with the size). The configuration file can declare those
-    formulas, and this helper evaluates each one row-by-row.
+    formulas, and this helper evaluates each one against whole columns at once when it only
+    uses pieces that behave the same on a column (see _is_vectorizable); any other formula
+    is evaluated row-by-row.
     NOTE: Formulas are trusted input; do not expose this to untrusted configs.
     """
+    if not computed:
+        return df
     env = {
         "to_date": to_date,
         "po_date_plus": po_date_plus,
         "concat": concat,
         "pd": pd,
     }
-    for col, expr in (computed or {}).items():
-        # allowed names are columns and env functions; each row is evaluated separately
-        def _eval_row(row):
-            local_vars = {k: row.get(k) for k in df.columns}
-            local_vars.update(env)
-            return eval(expr, {"__builtins__": {}}, local_vars)
-        df[col] = df.apply(_eval_row, axis=1)
+    for col, expr in computed.items():
+        tree = parse_formula(col, expr, set(df.columns) | env.keys())
+        # allowed names are columns and env functions; columns are passed as whole Series.
+        # Categorical columns (see transform) only speed up filtering: formulas get them back
+        # as plain text, since `+` and comparisons between categoricals raise.
+        local_vars = {c: (df[c].astype(df[c].cat.categories.dtype)
+                          if isinstance(df[c].dtype, pd.CategoricalDtype) else df[c])
+                      for c in df.columns}
+        local_vars.update(env)
+        if _is_vectorizable(tree):
+            df[col] = eval(compile(tree, "<computed>", "eval"), {"__builtins__": {}}, local_vars)
+            continue
+        # precompute any column-only concat(...) pieces, then walk the rows for the rest
+        hoist = _HoistConcat(df.columns)
+        tree = ast.fix_missing_locations(hoist.visit(tree))
+        for name, call in hoist.hoisted.items():
+            local_vars[name] = eval(compile(ast.Expression(call), "<computed>", "eval"),
+                                    {"__builtins__": {}}, local_vars)
+        rows = pd.DataFrame({name: local_vars[name] for name in [*df.columns, *hoist.hoisted]})
+        code = compile(tree, "<computed>", "eval")
+        # one namespace for the whole loop; each row just overwrites the column values
+        names = [c for c in rows.columns if c not in env]
+        row_vars = dict(env)
+        values = []
+        for row in rows[names].itertuples(index=False, name=None):
+            row_vars.update(zip(names, row))
+            values.append(eval(code, {"__builtins__": {}}, row_vars))
+        df[col] = pd.Series(values, index=rows.index)
     return df
 
+def _columns_referenced(cfg: dict) -> set[str] | None:
+    """
+    Work out which source columns (normalized names) the config can possibly use, by
+    following the final columns back through the rename and computed steps. Returns None
+    when every column may end up in the output, i.e. the config has no `columns_order`.
+    """
+    mappings = cfg.get("mappings", {}) or {}
+    output = cfg.get("output", {}) or {}
+    val = cfg.get("validation", {}) or {}
+    if not (order := output.get("columns_order")):
+        return None
+    # supplier-facing names -> internal names
+    needed = set(order) | set(val.get("required", [])) | set(val.get("positive_int", [])) | set(val.get("nonempty", []))
+    needed |= {normalize_column_name(k) for k, v in (output.get("rename_final", {}) or {}).items() if v in needed}
+    # internal names -> whatever the computed formulas read
+    for expr in ((mappings.get("computed") or {}).values()):
+        try:
+            needed |= formula_names(ast.parse(expr, mode="eval"))
+        except SyntaxError:
+            return None  # let apply_computed report the broken formula
+    # internal names -> source names, plus the columns the filters look at
+    needed |= {normalize_column_name(k) for k, v in (mappings.get("rename", {}) or {}).items() if v in needed}
+    flt = cfg.get("filters", {}) or {}
+    if flt.get("include_financial_status"): needed.add("financial_status")
+    if flt.get("exclude_fulfillment_status"): needed.add("fulfillment_status")
+    if flt.get("min_quantity") is not None: needed |= {"lineitem_quantity", "qty"}
+    return needed
+
+def _output_target(cfg: dict, out_dir: Path) -> tuple[Path, str]:
+    """Pick the output file (today's date or the supplier's pattern) and format; creates out_dir."""
+    today = datetime.now().strftime("%Y%m%d")
+    delivery = cfg.get("delivery", {}) or {}
+    fmt = (delivery.get("format") or "csv").lower()
+    filename = (delivery.get("filename_pattern") or f"supplier_{today}.csv").replace("{today}", today)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    return out_dir / filename, fmt
+
 # ---- core ----
-def transform(orders_path: Path, cfg_path: Path, out_dir: Path) -> Path:
+def transform(orders_path: Path, cfg_path: Path, out_dir: Path, engine: str = "pandas") -> Path:
     """
     Heart of the script: read input files, apply configuration rules, validate, then write
     the finished spreadsheet. Returns the path to the file we produced.
+    `engine="polars"` runs the same steps through transform_polars instead.
     """
-    cfg = yaml.safe_load(Path(cfg_path).read_text())
+    if engine not in ("pandas", "polars"):
+        raise ValueError(f"Unknown engine '{engine}'; use 'pandas' or 'polars'.")
+    if engine == "polars" and pl is None:
+        raise ValueError("The polars engine requires the polars package (pip install polars).")
+    cfg = load_config(cfg_path)
     if cfg is None:
         # Empty configs can happen if someone creates a file but forgets to fill it in.
         raise ValueError("Configuration file is empty; please add the supplier rules.")
-    df = load_frame(orders_path)
+    if engine == "polars":
+        return transform_polars(orders_path, cfg, out_dir)
+    df = load_frame(orders_path, _columns_referenced(cfg))
 
     # normalize source column names to snake_case
     df.columns = [normalize_column_name(c) for c in df.columns]
 
+    # store repetitive text columns (statuses by default) as categories
+    assumptions = cfg.get("input_assumptions", {}) or {}
+    for c in assumptions.get("categorical_columns", _DEFAULT_CATEGORICAL_COLUMNS) or []:
+        if (c := normalize_column_name(c)) in df.columns:
+            df[c] = df[c].astype("category")
+
     # basic filters
     # This section keeps only the rows the supplier actually cares about, based on
     # statuses and minimum quantities described in their config file.
+    # Every filter adds to one keep/drop mask so the table is only sliced once at the end.
     flt = cfg.get("filters", {})
+    keep = np.ones(len(df), dtype=bool)
     if inc := flt.get("include_financial_status"):
         if "financial_status" not in df.columns:
             raise ValueError("Filter 'include_financial_status' requires 'financial_status' column in source data.")
-        status = df["financial_status"].fillna("").astype(str).str.lower()
-        df = df[status.isin({s.lower() for s in inc})]
+        keep &= status_matches(df["financial_status"], {s.lower() for s in inc})
     if exc := flt.get("exclude_fulfillment_status"):
         if "fulfillment_status" not in df.columns:
             raise ValueError("Filter 'exclude_fulfillment_status' requires 'fulfillment_status' column in source data.")
-        status = df["fulfillment_status"].fillna("").astype(str).str.lower()
-        df = df[~status.isin({s.lower() for s in exc})]
+        keep &= ~status_matches(df["fulfillment_status"], {s.lower() for s in exc})
     if (mq := flt.get("min_quantity")) is not None:
         if "lineitem_quantity" in df.columns:
             qcol = "lineitem_quantity"
@@ -118,13 +443,18 @@ def transform(orders_path: Path, cfg_path: Path, out_dir: Path) -> Path:
         else:
             raise ValueError("Filter 'min_quantity' requires either 'lineitem_quantity' or 'qty' column.")
         df[qcol] = pd.to_numeric(df[qcol], errors="coerce").fillna(0).astype(int)
-        df = df[df[qcol] >= int(mq)]
+        keep &= (df[qcol] >= int(mq)).to_numpy(dtype=bool)
+    if not keep.all():
+        df = df.loc[keep]
 
     # rename to intermediate normalized names
     # At this point we align varying Shopify column names to the internal names expected
     # by the rest of the script so later steps can rely on consistent labels.
     ren = (cfg.get("mappings", {}) or {}).get("rename", {}) or {}
-    df = df.rename(columns={normalize_column_name(k): v for k, v in ren.items() if normalize_column_name(k) in df.columns})
+    if ren:
+        cols = set(df.columns)
+        rename_map = {nk: v for k, v in ren.items() if (nk := normalize_column_name(k)) in cols}
+        df.columns = [rename_map.get(c, c) for c in df.columns]  # relabel in place, no copy
 
     # computed columns
     # Build any extra columns the supplier requested (e.g., location notes or PO dates).
@@ -134,43 +464,176 @@ def transform(orders_path: Path, cfg_path: Path, out_dir: Path) -> Path:
     # Give the columns their final supplier-facing names and arrange them in the order
     # they expect in their template.
     final_map = (cfg.get("output", {}) or {}).get("rename_final", {}) or {}
-    df = df.rename(columns={normalize_column_name(k): v for k, v in final_map.items() if normalize_column_name(k) in df.columns})
+    if final_map:
+        cols = set(df.columns)
+        rename_map = {nk: v for k, v in final_map.items() if (nk := normalize_column_name(k)) in cols}
+        df.columns = [rename_map.get(c, c) for c in df.columns]  # relabel in place, no copy
     order = (cfg.get("output", {}) or {}).get("columns_order", [])
     if order:
-        for c in order:
-            if c not in df.columns: df[c] = ""  # ensure exists
-        df = df[order]
+        df = df.reindex(columns=order, fill_value="")  # missing columns are added as blanks
 
     # validation
     # Before we ship the file, double-check that columns the supplier marked as required
     # are present, non-empty, and (when needed) positive numbers. This prevents sending
     # incomplete purchase orders.
+    # Blank-text results are remembered per column, since `required` and `nonempty`
+    # often list the same columns.
     val = cfg.get("validation", {}) or {}
+    blank: dict[str, bool] = {}
+    def _has_blank(c: str) -> bool:
+        if c not in blank: blank[c] = has_blank_text(df[c])
+        return blank[c]
     for c in val.get("required", []):
-        if c not in df.columns or df[c].isna().any() or (df[c].astype(str).str.strip() == "").any():
+        if c not in df.columns or df[c].isna().any() or _has_blank(c):
             raise ValueError(f"Validation failed: required column '{c}' has missing values.")
     for c in val.get("positive_int", []):
         if c in df.columns:
-            if (pd.to_numeric(df[c], errors="coerce") <= 0).any():
+            q = df[c] if pd.api.types.is_numeric_dtype(df[c]) else pd.to_numeric(df[c], errors="coerce")
+            if (q <= 0).any():
                 raise ValueError(f"Validation failed: '{c}' must be > 0.")
     for c in val.get("nonempty", []):
         if c in df.columns:
-            if (df[c].astype(str).str.strip() == "").any():
+            if _has_blank(c):
                 raise ValueError(f"Validation failed: '{c}' has empty values.")
 
     # write output
     # Name the file using today's date (or the supplier's custom pattern) and export it
     # either as CSV or Excel depending on the config setting.
-    today = datetime.now().strftime("%Y%m%d")
-    delivery = cfg.get("delivery", {}) or {}
-    fmt = (delivery.get("format") or "csv").lower()
-    filename = (delivery.get("filename_pattern") or f"supplier_{today}.csv").replace("{today}", today)
-    out_path = out_dir / filename
-    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path, fmt = _output_target(cfg, out_dir)
+    write_frame(df, out_path, fmt)
+    return out_path
+
+# ---- polars engine ----
+# The same pipeline expressed as one Polars lazy query: Polars only reads the columns the
+# query needs and applies all filters in a single pass. Formulas are translated from their
+# syntax tree, so only columns, literals and the concat/to_date/po_date_plus helpers work here.
+_ISO_DATETIME = (r"^\d{4}-\d{2}-\d{2}(?:[ T](?:[01]\d|2[0-3]):[0-5]\d(?::[0-5]\d(?:\.\d+)?)?"
+                 r"(?:Z|[+-](?:[01]\d|2[0-3]):?[0-5]\d)?)?$")
+
+def _polars_text(e: "pl.Expr") -> "pl.Expr":
+    """A text version of a value for concat: blanks (and the text 'nan') become ''."""
+    e = e.cast(pl.String).fill_null("")
+    return pl.when(e == "nan").then(pl.lit("")).otherwise(e)
+
+def _polars_expr(col: str, node: ast.AST, columns: set[str]) -> "pl.Expr":
+    """Translate one formula (or a piece of one) into a Polars expression."""
+    if isinstance(node, ast.Expression):
+        return _polars_expr(col, node.body, columns)
+    if isinstance(node, ast.Name) and node.id in columns:
+        return pl.col(node.id)
+    if isinstance(node, ast.Constant) and isinstance(node.value, (str, int, float)):
+        return pl.lit(node.value)
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+        fn, kw = node.func.id, {k.arg: k.value for k in node.keywords}
+        if fn == "concat" and not kw:
+            parts = [_polars_text(_polars_expr(col, a, columns)) for a in node.args]
+            joined = pl.concat_str(parts, separator=" ") if parts else pl.lit("")
+            return joined.str.replace_all(r"\s+", " ").str.strip_chars()
+        if fn == "to_date" and len(node.args) == 1 and not kw:
+            d = _polars_expr(col, node.args[0], columns).cast(pl.String)
+            # ISO dates/times (with or without a UTC offset) keep the calendar date they were
+            # written with, exactly like pandas; anything else goes through to_date itself
+            iso = d.str.contains(_ISO_DATETIME)
+            fast = d.str.slice(0, 10).str.to_date("%Y-%m-%d", strict=False).dt.strftime("%Y-%m-%d")
+            slow = pl.when(~iso).then(d).map_elements(to_date, return_dtype=pl.String)
+            return pl.when(iso).then(fast).otherwise(slow).fill_null("")
+        if fn == "po_date_plus" and 1 <= len(node.args) <= 2 and set(kw) <= {"days"}:
+            days = node.args[1] if len(node.args) == 2 else kw.get("days", ast.Constant(0))
+            if isinstance(days, ast.Constant) and isinstance(days.value, int):
+                d = _polars_expr(col, node.args[0], columns).cast(pl.String)
+                ts = pl.when(d != "").then(d).str.to_date("%Y-%m-%d") + pl.duration(days=days.value)
+                return ts.dt.strftime("%Y-%m-%d").fill_null("")
+    raise ValueError(f"Computed column '{col}' uses a formula the polars engine can't translate; "
+                     "run with --engine pandas instead.")
+
+def transform_polars(orders_path: Path, cfg: dict, out_dir: Path) -> Path:
+    """Polars version of transform (same config, same checks, same output file)."""
+    if orders_path.suffix.lower() in (".xlsx", ".xls"):
+        lf = pl.read_excel(orders_path, infer_schema_length=0).lazy()
+        lf = lf.with_columns(pl.col(pl.String).replace(_NA_VALUES, None))  # blanks as pandas sees them
+    else:
+        # every column as text, with the same blank markers ("NA", "N/A", ...) pandas uses
+        lf = pl.scan_csv(orders_path, infer_schema_length=0, null_values=_NA_VALUES)
+    lf = lf.rename({c: normalize_column_name(c) for c in lf.collect_schema().names()})
+    names = set(lf.collect_schema().names())
+
+    # basic filters, combined into one predicate
+    flt = cfg.get("filters", {})
+    keep = []
+    if inc := flt.get("include_financial_status"):
+        if "financial_status" not in names:
+            raise ValueError("Filter 'include_financial_status' requires 'financial_status' column in source data.")
+        keep.append(pl.col("financial_status").fill_null("").str.to_lowercase().is_in([s.lower() for s in inc]))
+    if exc := flt.get("exclude_fulfillment_status"):
+        if "fulfillment_status" not in names:
+            raise ValueError("Filter 'exclude_fulfillment_status' requires 'fulfillment_status' column in source data.")
+        keep.append(~pl.col("fulfillment_status").fill_null("").str.to_lowercase().is_in([s.lower() for s in exc]))
+    if (mq := flt.get("min_quantity")) is not None:
+        if "lineitem_quantity" in names:
+            qcol = "lineitem_quantity"
+        elif "qty" in names:
+            qcol = "qty"
+        else:
+            raise ValueError("Filter 'min_quantity' requires either 'lineitem_quantity' or 'qty' column.")
+        # pd.to_numeric ignores surrounding spaces (" 2 "); Polars' cast doesn't
+        q = pl.col(qcol).str.strip_chars().cast(pl.Float64, strict=False).fill_nan(None).fill_null(0).cast(pl.Int64)
+        lf = lf.with_columns(q)
+        keep.append(pl.col(qcol) >= int(mq))
+    if keep:
+        lf = lf.filter(*keep)
+
+    # rename to intermediate names, then computed columns
+    ren = (cfg.get("mappings", {}) or {}).get("rename", {}) or {}
+    if mapping := {nk: v for k, v in ren.items() if (nk := normalize_column_name(k)) in names}:
+        lf = lf.rename(mapping)
+        names = set(lf.collect_schema().names())
+    helpers = {"to_date", "po_date_plus", "concat", "pd"}
+    for col, expr in ((cfg.get("mappings", {}) or {}).get("computed") or {}).items():
+        tree = parse_formula(col, expr, names | helpers)
+        lf = lf.with_columns(_polars_expr(col, tree, names).alias(col))
+        names.add(col)
+
+    # final rename & column order
+    final_map = (cfg.get("output", {}) or {}).get("rename_final", {}) or {}
+    if mapping := {nk: v for k, v in final_map.items() if (nk := normalize_column_name(k)) in names}:
+        lf = lf.rename(mapping)
+        names = set(lf.collect_schema().names())
+    if order := (cfg.get("output", {}) or {}).get("columns_order", []):
+        lf = lf.select([pl.col(c) if c in names else pl.lit("").alias(c) for c in order])
+    # validation has to see every row before anything is written, so run the query once here
+    try:
+        df = lf.collect()
+    except (pl.exceptions.ComputeError, pl.exceptions.InvalidOperationError) as e:
+        # e.g. po_date_plus on a value that isn't YYYY-MM-DD; report it like the pandas path
+        raise ValueError(f"Could not build the supplier file: {e}") from e
+
+    # validation (same rules and messages as transform)
+    val = cfg.get("validation", {}) or {}
+    blank: dict[str, bool] = {}
+    def _has_blank(c: str) -> bool:
+        if c not in blank: blank[c] = bool((df[c].cast(pl.String).str.strip_chars() == "").any())
+        return blank[c]
+    for c in val.get("required", []):
+        if c not in df.columns or df[c].null_count() or _has_blank(c):
+            raise ValueError(f"Validation failed: required column '{c}' has missing values.")
+    for c in val.get("positive_int", []):
+        if c in df.columns:
+            q = df[c] if df[c].dtype.is_numeric() else df[c].cast(pl.String).str.strip_chars()
+            if (q.cast(pl.Float64, strict=False) <= 0).any():
+                raise ValueError(f"Validation failed: '{c}' must be > 0.")
+    for c in val.get("nonempty", []):
+        if c in df.columns:
+            if _has_blank(c):
+                raise ValueError(f"Validation failed: '{c}' has empty values.")
+
+    # write blanks and True/False the way pandas' to_csv does
+    df = df.with_columns(pl.col(pl.String).replace("", None),
+                         pl.col(pl.Boolean).cast(pl.String).str.to_titlecase())
+    out_path, fmt = _output_target(cfg, out_dir)
     if fmt == "xlsx":
-        df.to_excel(out_path, index=False)
+        df.write_excel(out_path)
     else:
-        df.to_csv(out_path, index=False)
+        df.write_csv(out_path)
     return out_path
 
 def main():
@@ -182,8 +645,10 @@ def main():
     ap.add_argument("--orders", required=True, type=Path, help="Path to orders export (CSV/XLSX)")
     ap.add_argument("--config", required=True, type=Path, help="Supplier YAML config")
     ap.add_argument("--outdir", default=Path("out"), type=Path, help="Output directory")
+    ap.add_argument("--engine", choices=("pandas", "polars"), default="pandas",
+                    help="Data engine; polars is faster on large exports (requires polars)")
     args = ap.parse_args()
-    out = transform(args.orders, args.config, args.outdir)
+    out = transform(args.orders, args.config, args.outdir, args.engine)
     print(f"Wrote: {out}")
 
 if __name__ == "__main__":